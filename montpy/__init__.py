@@ -1,2 +1,3 @@
 from .mc import *
-from .qmc import *
\ No newline at end of file
+from .qmc import *
+from ._fastmc import fast_integrate, vectorize_integrand
@@ -0,0 +1,125 @@
+import numpy as np
+
+try:
+    from numba import njit, prange, vectorize, get_num_threads, get_thread_id
+except ImportError:
+    njit = None
+    vectorize = None
+
+
+if njit is not None:
+    # Not cached on disk: every distinct integrand would add another cache entry.
+    @njit(parallel=True, fastmath=True)
+    def _mc_kernel(bounds_lo, bounds_hi, num_samples, func):
+        dim = bounds_lo.shape[0]
+        scale = bounds_hi - bounds_lo
+        # One coordinate buffer per thread, reused for every sample that thread evaluates.
+        scratch = np.empty((get_num_threads(), dim))
+        total = 0.0
+        for i in prange(num_samples):
+            x = scratch[get_thread_id()]
+            for j in range(dim):
+                x[j] = bounds_lo[j] + np.random.random() * scale[j]
+            total += func(x)
+        volume = 1.0
+        for j in range(dim):
+            volume *= scale[j]
+        return total / num_samples * volume
+
+
+    @njit(cache=True)
+    def _kahan_sum_kernel(values):
+        # Two interleaved compensated sums, so consecutive additions do not wait on each other.
+        s0, c0, s1, c1 = 0.0, 0.0, 0.0, 0.0
+        n = values.shape[0]
+        for i in range(0, n - 1, 2):
+            y = values[i] - c0
+            t = s0 + y
+            c0 = (t - s0) - y
+            s0 = t
+            y = values[i + 1] - c1
+            t = s1 + y
+            c1 = (t - s1) - y
+            s1 = t
+        if n % 2:
+            y = values[n - 1] - c0
+            t = s0 + y
+            c0 = (t - s0) - y
+            s0 = t
+        return s0, c0, s1, c1
+
+
+def _kahan_add(total, compensation, value):
+    y = value - compensation
+    t = total + y
+    return t, (t - total) - y
+
+
+def _kahan_sum(values, total=0.0, compensation=0.0, count=None):
+    """
+    Add values to a running Kahan sum and return the updated (total, compensation) pair.
+    If count is given, a single value is broadcast to count values and any other mismatch raises ValueError.
+
+    With numba, real float32/float64, integer and boolean chunks are summed with a
+    compensated loop. Otherwise the chunk is summed pairwise by NumPy, in at least
+    float64 precision and keeping complex, extended-precision and object values intact.
+    Either way the running state is carried across chunks.
+    """
+    values = np.ravel(values)
+    if count is not None and values.size != count:
+        if values.size != 1:
+            raise ValueError(f"func returned {values.size} values for {count} samples.")
+        values = np.broadcast_to(values, (count,))
+    if njit is None or not (values.dtype in (np.float32, np.float64) or values.dtype.kind in "iub"):
+        if values.dtype.kind in "iubfc":
+            chunk_sum = np.sum(values, dtype=np.result_type(values.dtype, np.float64))
+        else:
+            chunk_sum = np.sum(values)
+        return _kahan_add(total, compensation, chunk_sum)
+    s0, c0, s1, c1 = _kahan_sum_kernel(values)
+    for value in (s0, -c0, s1, -c1):
+        total, compensation = _kahan_add(total, compensation, value)
+    return total, compensation
+
+
+def vectorize_integrand(signatures, target="parallel", **kwargs):
+    """
+    Compile a scalar integrand into a NumPy ufunc with numba.vectorize.
+
+    The resulting ufunc can be passed to any solver in place of a NumPy-based
+    function, e.g. QuasiMonteCarloSolver, which calls func(*samples.T).
+
+    Parameters:
+        signatures (list of str): Numba signatures, e.g. ["float64(float64, float64)"] for a 2-D integrand.
+        target (str): Numba target, "parallel" by default; "cpu" avoids threading overhead for small N.
+        **kwargs: Further options forwarded to numba.vectorize.
+
+    Returns:
+        callable: A decorator turning a scalar Python function into a ufunc.
+    """
+    if vectorize is None:
+        raise ImportError("vectorize_integrand requires numba. Install it with 'pip install numba'.")
+    return vectorize(signatures, target=target, **kwargs)
+
+
+def fast_integrate(func, domain, num_samples=1000):
+    """
+    Perform Monte Carlo integration with a parallel Numba kernel.
+
+    Sampling, mapping onto the domain, function evaluation and the reduction
+    are fused into a single loop, so no (N, d) sample array is allocated.
+
+    Parameters:
+        func (callable): An @njit-decorated function taking a 1-D array of length d and returning a float.
+        domain (list of tuples): The integration domain [(a1, b1), (a2, b2), ...].
+        num_samples (int): The number of random samples to generate.
+
+    Returns:
+        float: The estimated integral value.
+    """
+    if njit is None:
+        raise ImportError("fast_integrate requires numba. Install it with 'pip install numba'.")
+    bounds = np.array(domain, dtype=np.float64).reshape(-1, 2)
+    lo = np.ascontiguousarray(bounds[:, 0])
+    hi = np.ascontiguousarray(bounds[:, 1])
+    return _mc_kernel(lo, hi, num_samples, func)
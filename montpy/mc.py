@@ -1,44 +1,89 @@
 import numpy as np
+from scipy.stats import qmc
+import math
+from concurrent.futures import ProcessPoolExecutor
+from ._fastmc import _kahan_sum
 
 class MonteCarloSolver:
-    def __init__(self, func, domain):
+    def __init__(self, func, domain, seed=None, dtype=np.float64):
         """
         Initialize the Monte Carlo solver with a function and domain.
         
         Parameters:
-            func (callable): The function to integrate.
+            func (callable): The function to integrate. It receives an (N, d) array of samples,
+                or a 1-D array of N samples when domain is a tuple.
             domain (tuple or list of tuples): The integration domain. 
                 For single-variable functions, domain should be a tuple (a, b).
                 For multi-variable functions, domain should be a list of tuples [(a1, b1), (a2, b2), ...].
+            seed (int or None): Seed for the random number generator.
+            dtype (data-type): Floating point type of the samples, np.float64 or np.float32.
+                Function values are always summed in float64.
         """
         self.func = func
         self.domain = domain
+        self._dtype = np.dtype(dtype)
+        # A scalar (a, b) domain is stored as a single row; func then receives 1-D samples.
+        self._scalar_domain = np.ndim(domain) == 1
+        self._bounds = np.array(domain, dtype=float).reshape(-1, 2)
+        self._volume = float(np.prod(self._bounds[:, 1] - self._bounds[:, 0]))
+        self._lo = self._bounds[:, 0].astype(self._dtype)
+        self._scale = (self._bounds[:, 1] - self._bounds[:, 0]).astype(self._dtype)
+        self.rng = np.random.default_rng(seed)
     
-    def integrate(self, num_samples=1000):
+    def integrate(self, num_samples=1000, chunk_size=2**20, workers=None, mp_context=None):
         """
         Perform Monte Carlo integration.
         
         Parameters:
             num_samples (int): The number of random samples to generate.
+            chunk_size (int): The maximum number of samples held in memory at once.
+            workers (int or None): Number of processes to spread the samples over.
+                Each process draws from an independent random stream. func must be picklable,
+                and with the "spawn" or "forkserver" start methods it must be importable by the
+                workers, i.e. defined in a module or in a script guarded by if __name__ == "__main__".
+            mp_context (multiprocessing context or None): Context used to start the workers.
+                Defaults to the platform's default start method.
         
         Returns:
             float: The estimated integral value.
         """
-        samples = self._sample_from_distribution(num_samples)
-        
-        if isinstance(self.domain, tuple):
-            integral = np.mean(self.func(*samples.T)) * (self.domain[1] - self.domain[0])
-        elif isinstance(self.domain, list):
-            bounds = np.array(self.domain)
-            integral = np.mean(self.func(samples)) * np.prod(bounds[:, 1] - bounds[:, 0])
+        if workers is not None and workers > 1:
+            counts = [num_samples // workers + (i < num_samples % workers) for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+                futures = [
+                    executor.submit(_worker, self, rng, n, chunk_size)
+                    for rng, n in zip(self.rng.spawn(workers), counts)
+                ]
+                total = math.fsum(future.result() for future in futures)
+        else:
+            total = self._sum_chunks(num_samples, chunk_size)
         
-        return integral
+        return total / num_samples * self._volume
+    
+    def _sum_chunks(self, num_samples, chunk_size):
+        """
+        Return the sum of the function values over num_samples samples, drawn chunk by chunk.
+        """
+        total, compensation = 0.0, 0.0
+        for start in range(0, num_samples, chunk_size):
+            n = min(chunk_size, num_samples - start)
+            total, compensation = _kahan_sum(self._estimate_chunk(n), total, compensation, n)
+        return total
+    
+    def _estimate_chunk(self, num_samples):
+        """
+        Draw num_samples samples and return the function values.
+        """
+        samples = self._sample_from_distribution(num_samples)
+        if self._scalar_domain and samples.ndim == 2:
+            samples = samples[:, 0]
+        return self.func(samples)
     
     def _sample_from_distribution(self, num_samples):
         raise NotImplementedError("Subclasses must implement _sample_from_distribution method.")
 
 class ImportanceSampler(MonteCarloSolver):
-    def __init__(self, func, domain, pdf="uniform", custom_pdf=None):
+    def __init__(self, func, domain, pdf="uniform", custom_pdf=None, seed=None, dtype=np.float64):
         """
         Initialize the importance sampler with a function, domain, and probability distribution.
         
@@ -47,30 +92,30 @@ class ImportanceSampler(MonteCarloSolver):
             domain (tuple or list of tuples): The integration domain. 
                 For single-variable functions, domain should be a tuple (a, b).
                 For multi-variable functions, domain should be a list of tuples [(a1, b1), (a2, b2), ...].
-            pdf (str): Probability distribution to use. Options are "uniform", "gaussian", "exponential", or "custom".
+            pdf (str): Probability distribution to use. Options are "uniform", "stratified", "gaussian", "exponential", or "custom".
             custom_pdf (callable): Custom probability density function provided by the user. Required if pdf="custom".
+            seed (int or None): Seed for the random number generator.
+            dtype (data-type): Floating point type of the samples, np.float64 or np.float32.
         """
-        super().__init__(func, domain)
+        super().__init__(func, domain, seed, dtype)
         self.pdf = pdf
         self.custom_pdf = custom_pdf
     
     def _sample_from_distribution(self, num_samples):
+        num_dims = len(self._bounds)
         if self.pdf == "uniform":
-            if isinstance(self.domain, tuple):
-                a, b = self.domain
-                samples = np.random.uniform(a, b, num_samples)
-            elif isinstance(self.domain, list):
-                bounds = np.array(self.domain)
-                num_dims = len(bounds)
-                samples = np.random.uniform(bounds[:, 0], bounds[:, 1], (num_samples, num_dims))
+            samples = self.rng.random((num_samples, num_dims), dtype=self._dtype) * self._scale + self._lo
+        elif self.pdf == "stratified":
+            if num_dims == 1:
+                jitter = self.rng.random((num_samples, 1), dtype=self._dtype)
+                samples = (np.arange(num_samples, dtype=self._dtype)[:, None] + jitter) / num_samples
+            else:
+                samples = qmc.LatinHypercube(d=num_dims, seed=self.rng).random(num_samples).astype(self._dtype)
+            samples = samples * self._scale + self._lo
         elif self.pdf == "gaussian":
-            if isinstance(self.domain, tuple):
-                mu, sigma = (self.domain[0] + self.domain[1]) / 2, (self.domain[1] - self.domain[0]) / 6
-                samples = np.random.normal(mu, sigma, num_samples)
-            elif isinstance(self.domain, list):
-                means = [(low + high) / 2 for low, high in self.domain]
-                cov = np.diag([(high - low) / 6 for low, high in self.domain])
-                samples = np.random.multivariate_normal(means, cov, num_samples)
+            mus = self._lo + self._scale / 2
+            sigmas = self._scale / 6
+            samples = self.rng.standard_normal((num_samples, num_dims), dtype=self._dtype) * sigmas + mus
         elif self.pdf == "custom":
             if self.custom_pdf is None:
                 raise ValueError("Custom PDF must be provided for 'custom' distribution.")
@@ -80,4 +125,9 @@ class ImportanceSampler(MonteCarloSolver):
         
         return samples
 
-
+def _worker(solver, rng, num_samples, chunk_size):
+    """
+    Sum the function values over num_samples samples in a worker process, using the given generator.
+    """
+    solver.rng = rng
+    return solver._sum_chunks(num_samples, chunk_size)
@@ -1,9 +1,11 @@
 import numpy as np
 from scipy.stats import qmc
 import math
+import warnings
+from ._fastmc import _kahan_sum
 
 class QuasiMonteCarloSolver:
-    def __init__(self, func, domain):
+    def __init__(self, func, domain, dtype=np.float64):
         """
         Initialize the Quasi-Monte Carlo solver with a function and domain.
         
@@ -12,141 +14,226 @@ class QuasiMonteCarloSolver:
             domain (tuple or list of tuples): The integration domain. 
                 For single-variable functions, domain should be a tuple (a, b).
                 For multi-variable functions, domain should be a list of tuples [(a1, b1), (a2, b2), ...].
+            dtype (data-type): Floating point type of the samples, np.float64 or np.float32.
+                Function values are always summed in float64.
         """
         self.func = func
         self.domain = np.array(domain)
+        self._dtype = np.dtype(dtype)
+        self._volume = float(np.prod(self.domain[:, 1] - self.domain[:, 0]))
+        self._lo = self.domain[:, 0].astype(self._dtype)
+        self._scale = (self.domain[:, 1] - self.domain[:, 0]).astype(self._dtype)
+        self._sobol = None
+        self._halton = None
     
-    def integrate_sobol(self, num_samples=1024):
+    def integrate_sobol(self, num_samples=1024, chunk_size=2**20, scramble=True):
         """
         Perform quasi-Monte Carlo integration using Sobol sequence.
         
         Parameters:
             num_samples (int): The number of quasi-random samples to generate.
+            chunk_size (int): The maximum number of samples held in memory at once.
+            scramble (bool): Use SciPy's scrambled Sobol sequence. If False, the unscrambled
+                sequence is generated in-house (up to 21 dimensions).
         
         Returns:
             float: The estimated integral value.
         """
-        samples = self._generate_sobol_samples(num_samples)
-        samples = self._transform_samples(samples)
-        
-        if len(self.domain) == 1:  # Univariate functions
-            integral = np.mean(self.func(samples[:, 0])) * (self.domain[0][1] - self.domain[0][0])
-        else:  # Multivariate functions
-            integral = np.mean(self.func(*samples.T)) * np.prod(self.domain[:, 1] - self.domain[:, 0])
-        
-        return integral
+        num_samples = 2 ** math.ceil(math.log2(num_samples))
+        if not scramble:
+            return self._integrate(lambda start, n: self._generate_gray_sobol_samples(n, start), num_samples, chunk_size)
+        if self._sobol is None:
+            self._sobol = qmc.Sobol(d=self.domain.shape[0], scramble=True)
+        else:
+            self._sobol.reset()
+        return self._integrate(lambda start, n: self._generate_sobol_samples(n), num_samples, chunk_size)
     
-    def integrate_halton(self, num_samples=1000):
+    def integrate_halton(self, num_samples=1000, chunk_size=2**20, scramble=True):
         """
         Perform quasi-Monte Carlo integration using Halton sequence.
         
         Parameters:
             num_samples (int): The number of quasi-random samples to generate.
+            chunk_size (int): The maximum number of samples held in memory at once.
+            scramble (bool): Use SciPy's scrambled Halton sequence. If False, the deterministic
+                radical-inverse sequence is generated in-house.
         
         Returns:
             float: The estimated integral value.
         """
-        samples = self._generate_halton_samples(num_samples)
-        samples = self._transform_samples(samples)
-        
-        if len(self.domain) == 1:  # Univariate functions
-            integral = np.mean(self.func(samples[:, 0])) * (self.domain[0][1] - self.domain[0][0])
-        else:  # Multivariate functions
-            integral = np.mean(self.func(*samples.T)) * np.prod(self.domain[:, 1] - self.domain[:, 0])
-        
-        return integral
+        if not scramble:
+            return self._integrate(lambda start, n: self._generate_radical_inverse_halton_samples(n, start), num_samples, chunk_size)
+        if self._halton is None:
+            self._halton = qmc.Halton(d=self.domain.shape[0], scramble=True)
+        else:
+            self._halton.reset()
+        return self._integrate(lambda start, n: self._generate_halton_samples(n), num_samples, chunk_size)
 
     
-    def integrate_hammersley(self, num_samples=1000):
+    def integrate_hammersley(self, num_samples=1000, chunk_size=2**20):
         """
         Perform quasi-Monte Carlo integration using Hammersley sequence.
         
         Parameters:
             num_samples (int): The number of quasi-random samples to generate.
+            chunk_size (int): The maximum number of samples held in memory at once.
         
         Returns:
             float: The estimated integral value.
         """
-        samples = self._generate_hammersley_samples(num_samples)
-        samples = self._transform_samples(samples)
-        
+        return self._integrate(
+            lambda start, n: self._generate_hammersley_samples(num_samples, start, start + n), num_samples, chunk_size
+        )
+
+    def _integrate(self, generate, num_samples, chunk_size):
+        """
+        Average the function over num_samples points, generating and evaluating them chunk by chunk.
+        generate(start, n) must return the n unit-cube points of the sequence starting at index start,
+        as a (d, n) array so that each coordinate is contiguous when passed to func.
+        """
+        total, compensation = 0.0, 0.0
+        for start in range(0, num_samples, chunk_size):
+            n = min(chunk_size, num_samples - start)
+            total, compensation = _kahan_sum(self._estimate_chunk(generate(start, n)), total, compensation, n)
+        return total / num_samples * self._volume
+
+    def _estimate_chunk(self, samples):
+        """
+        Map a chunk of unit-cube samples onto the domain and return the function values.
+        """
+        samples = self._transform_samples(samples.astype(self._dtype, copy=False))
         if len(self.domain) == 1:  # Univariate functions
-            integral = np.mean(self.func(samples[:, 0])) * (self.domain[0][1] - self.domain[0][0])
+            return self.func(samples[0])
         else:  # Multivariate functions
-            integral = np.mean(self.func(*samples.T)) * np.prod(self.domain[:, 1] - self.domain[:, 0])
-        
-        return integral
+            return self.func(*samples)
 
-    
     def _generate_sobol_samples(self, num_samples):
         """
-        Generate Sobol sequence samples.
+        Draw the next Sobol sequence samples from the cached generator.
         """
-        num_samples = 2 ** math.ceil(math.log2(num_samples))
-        # print(num_samples)
-        dim = self.domain.shape[1]
-        sobol_generator = qmc.Sobol(d=dim, scramble=True)
-        samples = sobol_generator.random(num_samples)
-        samples = self._transform_samples(samples)
-        return samples
+        with warnings.catch_warnings():
+            # Chunks are slices of a 2**m point set, which is balanced as a whole.
+            warnings.filterwarnings("ignore", message="The balance properties", category=UserWarning)
+            samples = self._sobol.random(num_samples)
+        return np.ascontiguousarray(samples.T)
+
+    def _generate_gray_sobol_samples(self, num_samples, start=0):
+        """
+        Generate unscrambled Sobol sequence samples, starting at the given index, in Gray-code order.
+        Each point is the previous one XOR the direction number of the rightmost zero bit of the
+        previous index, so the whole chunk is a cumulative XOR over the selected direction numbers.
+        """
+        directions = self._sobol_direction_numbers(self.domain.shape[0])
+        points = np.empty((directions.shape[1], num_samples), dtype=np.uint32)
+        if num_samples:
+            gray = start ^ (start >> 1)
+            first = np.zeros(directions.shape[1], dtype=np.uint32)
+            for k in range(32):
+                if (gray >> k) & 1:
+                    first ^= directions[k]
+            points[:, 0] = first
+            steps = np.arange(start + 1, start + num_samples, dtype=np.int64)
+            points[:, 1:] = directions[np.log2(steps & -steps).astype(np.int64)].T
+            np.bitwise_xor.accumulate(points, axis=1, out=points)
+        return points * 2.0**-32
+
+    @classmethod
+    def _sobol_direction_numbers(cls, dim):
+        """
+        Build the (32, dim) table of Sobol direction numbers from the Joe-Kuo parameters.
+        """
+        if dim > len(cls._joe_kuo) + 1:
+            raise ValueError(f"Unscrambled Sobol samples are available for up to {len(cls._joe_kuo) + 1} dimensions.")
+        directions = np.empty((32, dim), dtype=np.uint32)
+        directions[:, 0] = [1 << (31 - k) for k in range(32)]
+        for j, (s, a, m) in enumerate(cls._joe_kuo[:dim - 1], start=1):
+            v = [m[k] << (31 - k) for k in range(s)]
+            for k in range(s, 32):
+                x = v[k - s] ^ (v[k - s] >> s)
+                for l in range(1, s):
+                    if (a >> (s - 1 - l)) & 1:
+                        x ^= v[k - l]
+                v.append(x)
+            directions[:, j] = v
+        return directions
 
     def _generate_halton_samples(self, num_samples):
         """
-        Generate Halton sequence samples.
+        Draw the next scrambled Halton sequence samples from the cached generator.
         """
-        dim = self.domain.shape[1]
-        samples = np.zeros((num_samples, dim))
-        for i in range(num_samples):
-            samples[i] = self._halton_sample(i + 1, dim)
-        return samples
+        return np.ascontiguousarray(self._halton.random(num_samples).T)
+
+    def _generate_radical_inverse_halton_samples(self, num_samples, start=0):
+        """
+        Generate unscrambled Halton sequence samples, starting at the given index.
+        """
+        dim = self.domain.shape[0]
+        indices = np.arange(start + 1, start + num_samples + 1, dtype=np.int64)
+        return self._radical_inverse(indices, self._primes_np[:dim])
     
-    def _generate_hammersley_samples(self, num_samples):
+    def _generate_hammersley_samples(self, num_samples, start=0, stop=None):
         """
-        Generate Hammersley sequence samples.
+        Generate the points start to stop of the num_samples-point Hammersley set.
         """
-        samples = np.zeros((num_samples, self.domain.shape[1]))
-        for i in range(self.domain.shape[1]):
-            samples[:, i] = np.linspace(0, 1, num_samples)
+        if stop is None:
+            stop = num_samples
+        dim = self.domain.shape[0]
+        indices = np.arange(start, stop, dtype=np.int64)
+        samples = np.empty((dim, len(indices)))
+        samples[0] = (indices + 0.5) / num_samples
+        samples[1:] = self._radical_inverse(indices, self._primes_np[:dim - 1])
         return samples
     
-    def _sobol_sample(self, index, dim):
-        """
-        Generate a single Sobol sequence sample.
-        """
-        v = np.zeros(dim)
-        c = 1 / (1 << 32)
-        for i in range(dim):
-            value = 0
-            while index:
-                if index & 1:
-                    break
-                value += 1
-                index >>= 1
-            v[i] = value * c
-            index ^= 1
-        return v
-    
-    def _halton_sample(self, index, dim):
-        """
-        Generate a single Halton sequence sample.
-        """
-        v = np.zeros(dim)
-        for i in range(dim):
-            f = 1
-            r = 0
-            idx = index
-            while idx > 0:
-                f /= self._primes[i]
-                r += f * (idx % self._primes[i])
-                idx //= self._primes[i]
-            v[i] = r
-        return v
-    
+    @classmethod
+    def _radical_inverse(cls, indices, bases):
+        """
+        Compute the radical inverse of an array of indices in each of the given bases.
+        Returns a (len(bases), len(indices)) array.
+        """
+        out = np.zeros((len(bases), len(indices)))
+        first = 0
+        if len(bases) and bases[0] == 2 and (len(indices) == 0 or indices.max() < 2**32):
+            out[0] = cls._radical_inverse_base2(indices)
+            first = 1
+        bases = bases[first:, None]
+        idx = np.repeat(indices[None, :], len(bases), axis=0)
+        f = 1.0 / bases
+        while np.any(idx):
+            out[first:] += (idx % bases) * f
+            idx //= bases
+            f /= bases
+        return out
+
+    @staticmethod
+    def _radical_inverse_base2(indices):
+        """
+        Compute the base-2 radical inverse of indices below 2**32 by reversing their bits.
+        """
+        i = indices.astype(np.uint32)
+        i = ((i & 0x55555555) << 1) | ((i & 0xAAAAAAAA) >> 1)
+        i = ((i & 0x33333333) << 2) | ((i & 0xCCCCCCCC) >> 2)
+        i = ((i & 0x0F0F0F0F) << 4) | ((i & 0xF0F0F0F0) >> 4)
+        i = ((i & 0x00FF00FF) << 8) | ((i & 0xFF00FF00) >> 8)
+        i = (i << 16) | (i >> 16)
+        return i * 2.0**-32
+
     def _transform_samples(self, samples):
         """
-        Transform samples to fit within the given domain.
+        Transform (d, N) samples to fit within the given domain. The samples array is updated in place.
         """
-        return samples * (self.domain[:, 1] - self.domain[:, 0]) + self.domain[:, 0]
+        np.multiply(samples, self._scale[:, None], out=samples)
+        np.add(samples, self._lo[:, None], out=samples)
+        return samples
 
     _primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97, 101, 103, 107, 109, 113, 127, 131, 137, 139, 149, 151, 157, 163, 167, 173, 179, 181, 191, 193, 197, 199, 211, 223, 227, 229, 233, 239, 241, 251, 257, 263, 269, 271, 277, 281, 283, 293, 307, 311, 313, 317, 331, 337, 347, 349, 353, 359, 367, 373, 379, 383, 389, 397, 401, 409, 419, 421, 431, 433, 439, 443, 449, 457, 461, 463, 467, 479, 487, 491, 499, 503, 509, 521, 523, 541, 547, 557, 563, 569, 571, 577, 587, 593, 599, 601, 607, 613, 617, 619, 631, 641, 643, 647, 653, 659, 661, 673, 677, 683, 691, 701, 709, 719, 727, 733, 739, 743, 751, 757, 761, 769, 773, 787, 797, 809, 811, 821, 823, 827, 829, 839, 853, 857, 859, 863, 877, 881, 883, 887, 907, 911, 919, 929, 937, 941, 947, 953, 967, 971, 977, 983, 991, 997]
+    _primes_np = np.array(_primes, dtype=np.int64)
 
+    # Joe-Kuo (new-joe-kuo-6.21201) parameters (s, a, m) for Sobol dimensions 2 to 21.
+    _joe_kuo = [
+        (1, 0, [1]), (2, 1, [1, 3]), (3, 1, [1, 3, 1]), (3, 2, [1, 1, 1]), (4, 1, [1, 1, 3, 3]),
+        (4, 4, [1, 3, 5, 13]), (5, 2, [1, 1, 5, 5, 17]), (5, 4, [1, 1, 5, 5, 5]), (5, 7, [1, 1, 7, 11, 19]),
+        (5, 11, [1, 1, 5, 1, 1]), (5, 13, [1, 1, 1, 3, 11]), (5, 14, [1, 3, 5, 5, 31]),
+        (6, 1, [1, 3, 3, 9, 7, 49]), (6, 13, [1, 1, 1, 15, 21, 21]), (6, 16, [1, 3, 1, 13, 27, 49]),
+        (6, 19, [1, 1, 1, 15, 7, 5]), (6, 22, [1, 3, 1, 15, 13, 25]), (6, 25, [1, 1, 5, 5, 19, 61]),
+        (7, 1, [1, 3, 7, 11, 23, 15, 103]), (7, 4, [1, 3, 7, 13, 13, 15, 69]),
+    ]
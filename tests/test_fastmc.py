@@ -0,0 +1,64 @@
+import math
+import unittest
+import numpy as np
+from montpy._fastmc import fast_integrate, vectorize_integrand, _kahan_sum
+from montpy.qmc import QuasiMonteCarloSolver
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+@unittest.skipIf(njit is None, "numba is not installed")
+class TestFastIntegrate(unittest.TestCase):
+    def test_multi_variable_integration(self):
+        @njit
+        def f(x):
+            return x[0]**2 + x[1]**2
+
+        integral = fast_integrate(f, [(0, 1), (0, 1)], num_samples=100000)
+        self.assertAlmostEqual(integral, 2/3, delta=0.05)
+
+    def test_single_variable_integration(self):
+        @njit
+        def f(x):
+            return x[0]**2
+
+        integral = fast_integrate(f, [(0, 2)], num_samples=100000)
+        self.assertAlmostEqual(integral, 8/3, delta=0.1)
+
+    def test_vectorized_integrand(self):
+        @vectorize_integrand(["float64(float64, float64)"])
+        def f(x, y):
+            return x**2 + y**2
+
+        solver = QuasiMonteCarloSolver(f, [(0, 1), (0, 1)])
+        integral = solver.integrate_sobol(num_samples=1024)
+        self.assertAlmostEqual(integral, 2/3, delta=0.01)
+
+class TestKahanSum(unittest.TestCase):
+    def test_matches_exact_sum_across_chunks(self):
+        values = np.random.default_rng(0).random(100001, dtype=np.float32)
+        total, compensation = 1e8, 0.0
+        for chunk in np.array_split(values, 7):
+            total, compensation = _kahan_sum(chunk, total, compensation)
+        self.assertAlmostEqual(total, math.fsum([1e8, *values.astype(np.float64)]), places=6)
+
+    def test_keeps_complex_values(self):
+        values = np.full(1000, 1 + 2j)
+        total, compensation = _kahan_sum(values)
+        self.assertEqual(total, 1000 + 2000j)
+
+    def test_keeps_extended_precision_values(self):
+        values = np.full(1000, 0.5, dtype=np.longdouble)
+        total, compensation = _kahan_sum(values)
+        self.assertEqual(np.asarray(total).dtype, np.longdouble)
+        self.assertEqual(total, 500)
+
+    def test_integer_and_half_precision_values(self):
+        self.assertEqual(_kahan_sum(np.arange(1000))[0], 499500)
+        self.assertEqual(_kahan_sum(np.ones(1000, dtype=bool))[0], 1000)
+        self.assertEqual(_kahan_sum(np.full(4096, 1, dtype=np.float16))[0], 4096)
+
+if __name__ == "__main__":
+    unittest.main()
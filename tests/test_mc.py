@@ -2,6 +2,10 @@ import unittest
 import numpy as np
 from montpy.mc import MonteCarloSolver, ImportanceSampler
 
+def product(samples):
+    x, y = samples.T
+    return x * y
+
 class TestMonteCarloSolver(unittest.TestCase):
     def test_single_variable_integration(self):
         def f(samples):
@@ -51,5 +55,92 @@ class TestImportanceSampler(unittest.TestCase):
 
         self.assertAlmostEqual(integral, 2/3, delta=0.3)
 
+    def test_gaussian_standard_deviation(self):
+        domain = [(0, 1), (0, 6), (-3, 3)]
+
+        sampler = ImportanceSampler(lambda samples: samples[:, 0], domain, pdf="gaussian", seed=0)
+        samples = sampler._sample_from_distribution(100000)
+
+        np.testing.assert_allclose(samples.std(axis=0), [1/6, 1, 1], rtol=0.02)
+        np.testing.assert_allclose(samples.mean(axis=0), [0.5, 3, 0], atol=0.02)
+
+    def test_stratified_distribution(self):
+        def f(samples):
+            x, y = samples.T
+            return x**2 + y**2
+
+        domain = [(0, 1), (0, 1)]
+
+        sampler = ImportanceSampler(f, domain, pdf="stratified")
+        integral = sampler.integrate(num_samples=1000)
+
+        self.assertAlmostEqual(integral, 2/3, delta=0.05)
+
+    def test_chunked_integration(self):
+        def f(samples):
+            x, y = samples.T
+            return x * y
+
+        domain = [(0, 1), (0, 2)]
+
+        sampler = ImportanceSampler(f, domain, seed=0)
+        integral = sampler.integrate(num_samples=10000, chunk_size=1000)
+
+        self.assertAlmostEqual(integral, 1, delta=0.1)
+
+    def test_parallel_integration(self):
+        domain = [(0, 1), (0, 2)]
+
+        sampler = ImportanceSampler(product, domain, seed=0)
+        integral = sampler.integrate(num_samples=10000, chunk_size=1000, workers=2)
+        repeated = ImportanceSampler(product, domain, seed=0).integrate(num_samples=10000, chunk_size=1000, workers=2)
+
+        self.assertAlmostEqual(integral, 1, delta=0.1)
+        self.assertEqual(integral, repeated)
+
+    def test_float32_samples(self):
+        def f(samples):
+            self.assertEqual(samples.dtype, np.float32)
+            x, y = samples.T
+            return x * y
+
+        sampler = ImportanceSampler(f, [(0, 1), (0, 2)], seed=0, dtype=np.float32)
+        integral = sampler.integrate(num_samples=10000)
+
+        self.assertIsInstance(integral, float)
+        self.assertAlmostEqual(integral, 1, delta=0.1)
+
+    def test_tuple_domain(self):
+        def f(x):
+            self.assertEqual(x.ndim, 1)
+            return x**2
+
+        for pdf in ("uniform", "stratified"):
+            sampler = ImportanceSampler(f, (0, 2), pdf=pdf, seed=0)
+            integral = sampler.integrate(num_samples=10000)
+
+            self.assertAlmostEqual(integral, 8/3, delta=0.1)
+
+    def test_constant_integrand(self):
+        sampler = ImportanceSampler(lambda samples: 1.0, [(0, 1), (0, 2)], seed=0)
+        self.assertAlmostEqual(sampler.integrate(num_samples=1000, chunk_size=300), 2)
+
+    def test_mismatched_value_count(self):
+        sampler = ImportanceSampler(lambda samples: samples[:10, 0], [(0, 1), (0, 2)], seed=0)
+        with self.assertRaises(ValueError):
+            sampler.integrate(num_samples=1000)
+
+    def test_seed_is_reproducible(self):
+        def f(samples):
+            x, y = samples.T
+            return x * y
+
+        domain = [(0, 1), (0, 2)]
+
+        first = ImportanceSampler(f, domain, seed=42).integrate(num_samples=1000)
+        second = ImportanceSampler(f, domain, seed=42).integrate(num_samples=1000)
+
+        self.assertEqual(first, second)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import numpy as np
+from scipy.stats import qmc
 from montpy.qmc import QuasiMonteCarloSolver
 
 class TestQuasiMonteCarloSolver(unittest.TestCase):
@@ -47,5 +49,57 @@ class TestQuasiMonteCarloSolver(unittest.TestCase):
         integral = self.solver_univariate.integrate_hammersley(num_samples=1000)
         self.assertAlmostEqual(integral, 1/3, delta=0.1)
 
+    def test_integrate_sobol_shifted_domain(self):
+        solver = QuasiMonteCarloSolver(lambda x, y: x + y, [(1, 2), (2, 4)])
+        integral = solver.integrate_sobol(num_samples=1024)
+        self.assertAlmostEqual(integral, 9, delta=0.1)
+
+    def test_chunked_integration_matches_single_pass(self):
+        for method in ("integrate_sobol", "integrate_halton", "integrate_hammersley"):
+            integrate = getattr(self.solver_multivariate, method)
+            self.assertAlmostEqual(integrate(num_samples=2048, chunk_size=300), integrate(num_samples=2048), places=10)
+
+    def test_base2_radical_inverse(self):
+        indices = np.arange(1, 1025, dtype=np.int64)
+        expected = [sum(((i >> k) & 1) / 2**(k + 1) for k in range(11)) for i in indices]
+        np.testing.assert_allclose(QuasiMonteCarloSolver._radical_inverse_base2(indices), expected)
+
+    def test_gray_code_sobol_matches_scipy(self):
+        solver = QuasiMonteCarloSolver(lambda *x: x[0], [(0, 1)] * 21)
+        expected = qmc.Sobol(d=21, scramble=False).random(2048).T
+        np.testing.assert_allclose(solver._generate_gray_sobol_samples(2048), expected, atol=1e-9)
+        np.testing.assert_allclose(solver._generate_gray_sobol_samples(1000, start=1048), expected[:, 1048:], atol=1e-9)
+
+    def test_integrate_sobol_unscrambled(self):
+        integral = self.solver_multivariate.integrate_sobol(num_samples=1024, scramble=False)
+        self.assertAlmostEqual(integral, 2/3, delta=0.01)
+
+    def test_float32_samples(self):
+        def f(x, y):
+            self.assertEqual(x.dtype, np.float32)
+            return x * y
+
+        solver = QuasiMonteCarloSolver(f, [(0, 1), (0, 2)], dtype=np.float32)
+        self.assertAlmostEqual(solver.integrate_halton(num_samples=1000), 1, delta=0.01)
+
+    def test_integrate_halton_unscrambled(self):
+        integral = self.solver_multivariate.integrate_halton(num_samples=1000, scramble=False)
+        self.assertAlmostEqual(integral, 2/3, delta=0.01)
+
+    def test_complex_integrand(self):
+        solver = QuasiMonteCarloSolver(lambda x, y: x + 1j * y, [(0, 1), (0, 1)])
+        integral = solver.integrate_halton(num_samples=1000)
+        self.assertAlmostEqual(integral.real, 0.5, delta=0.01)
+        self.assertAlmostEqual(integral.imag, 0.5, delta=0.01)
+
+    def test_constant_integrand(self):
+        solver = QuasiMonteCarloSolver(lambda x, y: 1.0, [(0, 1), (0, 2)])
+        self.assertAlmostEqual(solver.integrate_halton(num_samples=1000, chunk_size=300), 2)
+
+    def test_integrate_hammersley_trivariate(self):
+        solver = QuasiMonteCarloSolver(lambda x, y, z: x * y * z, [(0, 1), (0, 2), (0, 3)])
+        integral = solver.integrate_hammersley(num_samples=1000)
+        self.assertAlmostEqual(integral, 4.5, delta=0.1)
+
 if __name__ == "__main__":
     unittest.main()